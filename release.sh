@@ -1,11 +1,13 @@
 #!/bin/sh
 set -e
+REPOSITORY=${1:-shibboleth}
 python test_shibboleth.py
 if [ $? -ne 0 ]; then
     echo "Tests failed"
     exit
 fi
 python -m build
-twine check dist/shibboleth-$(python shibboleth.py version)-py3-none-any.whl
-git tag -a $(python shibboleth.py version)
-twine upload --config-file $HOME/.pypirc -u __token__ -r shibboleth dist/shibboleth-$(python shibboleth.py version)-py3-none-any.whl --verbose
+VERSION=$(sed -n "s/^__version__ = '\(.*\)'$/\1/p" shibboleth.py)
+twine check dist/shibboleth-$VERSION-py3-none-any.whl
+git tag -a $VERSION
+twine upload --config-file $HOME/.pypirc -u __token__ -r $REPOSITORY dist/shibboleth-$VERSION-py3-none-any.whl --verbose
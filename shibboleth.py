@@ -1,18 +1,18 @@
+import bisect
 import cmd
 import functools
-import glob
 import itertools
 import logging
 import os
-import pkg_resources
 import re
-import readline
+import shlex
+import shutil
+import signal
 import subprocess
 import sys
 import types
-import webbrowser
 
-from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from textwrap import dedent
@@ -22,6 +22,24 @@ logger = logging.getLogger(__name__)
 __version__ = '0.9.1'
 
 HIDDEN_FILES = ('.last.shib', '.gitignore', 'shibboleth.log')
+# Commands that never touch task files, so there's nothing for git to commit
+READ_ONLY_COMMANDS = frozenset(
+    (
+        '?',
+        'help',
+        'later',
+        'ls',
+        'next',
+        'now',
+        'pls',
+        'report',
+        'show',
+        'someday',
+        'soon',
+        'version',
+        'waiting',
+    )
+)
 DEFAULT_COLORS = {
     'inbox': 34,
     '1-now': 31,  # red
@@ -31,6 +49,9 @@ DEFAULT_COLORS = {
     '5-someday': 90,  # dark gray
     '6-waiting': 95,  # light pink?
 }
+COLORIZED_TAGS = {
+    tag: f'\x1b[{color}m{tag}\x1b[0m' for tag, color in DEFAULT_COLORS.items()
+}
 PRIORITIES = {
     'inbox': 'inbox',
     '1': '1-now',
@@ -40,17 +61,62 @@ PRIORITIES = {
     '5': '5-someday',
     '6': '6-waiting',
 }
+# Interned, like parsed tags, so membership checks mostly compare by identity
+PRIORITY_TAGS = tuple(sys.intern(tag) for tag in PRIORITIES.values())
+REPORT_PRIORITIES = {'done': 'done', **PRIORITIES}
+
+# Signals system() would ignore while the editor runs
+EDITOR_SIGNALS = tuple(
+    getattr(signal, name) for name in ('SIGINT', 'SIGQUIT') if hasattr(signal, name)
+)
+
+# Either `title[tags].ext`, or for untagged files just `title.ext`
+FILENAME_PATTERN = re.compile(
+    r'(?P<title>[^\[]*)\[(?P<tags>[^\]]*)\](?:\.(?P<ext>.*))?'
+    r'|(?P<untagged_title>[^.]*)(?:\.(?P<untagged_ext>.*))?'
+)
+
+
+def colorize(tag):
+    try:
+        return COLORIZED_TAGS[tag]
+    except KeyError:
+        return f'\x1b[32m{tag}\x1b[0m'
 
-TAG_PATTERN = re.compile(r'(?P<title>.*?)\[(?P<tags>.*?)\](\.(?P<ext>.*))?')
-NO_TAG_PATTERN = re.compile(r'(?P<title>[^.]*)(?:\.(?P<ext>.*))?')
+
+def print_lines(lines):
+    '''
+    Print the lines with a single write instead of one print() each.
+    '''
+    lines = list(lines)
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def edit(editor, flags, filename):
-    if editor.lower() in ('vi', 'vim'):
-        flags = "-n " + flags
-    else:
-        flags = ''
-    os.system(f'{editor} {flags} "{filename}"')
+    # Run the editor directly, without a shell in between. EDITOR may carry
+    # its own arguments, e.g. "code -w".
+    try:
+        command = shlex.split(editor)
+        if editor.lower() in ('vi', 'vim'):
+            command += ['-n', *shlex.split(flags)]
+        process = subprocess.Popen([*command, filename])
+    except (OSError, ValueError) as e:
+        # Like the shell would, complain and carry on rather than quitting
+        logger.debug('Unable to run editor %r', editor, exc_info=True)
+        print(f'Unable to run editor {editor!r}: {e}')
+        return
+    # Like system(), ignore Ctrl-C/Ctrl-\ while the editor has the terminal,
+    # otherwise e.g. emacs' C-g would interrupt us and kill the editor. This
+    # has to happen after spawning, or the editor would inherit the ignore.
+    old_handlers = {
+        signum: signal.signal(signum, signal.SIG_IGN) for signum in EDITOR_SIGNALS
+    }
+    try:
+        process.wait()
+    finally:
+        for signum, handler in old_handlers.items():
+            signal.signal(signum, handler)
 
 
 def launch(filename):
@@ -59,17 +125,18 @@ def launch(filename):
     urls in a webbrowser.
     '''
     last = None
-    headers = defaultdict(list)
+    urls = []
     with open(filename) as f:
         for line in f:
             if last == line == '\n':
                 break
-            else:
-                key, _, val = line.strip().partition(':')
-                if val:
-                    headers[key].append(val.strip())
+            # Only URL headers matter here, so don't bother splitting the rest
+            header = line.lstrip()
+            if header.startswith('URL:'):
+                url = header[4:].strip()
+                if url:
+                    urls.append(url)
             last = line
-    urls = headers.get('URL')
     if not urls:
         print('No URL headers found')
     else:
@@ -93,25 +160,92 @@ def launch(filename):
                     except ValueError:
                         logger.exception('Non-number in choices')
                         print('Non-number found')
-        for choice in choices:
-            webbrowser.open(urls[choice])
+        open_in_browser([urls[choice] for choice in choices])
+
+
+def open_in_browser(urls):
+    '''
+    Open the urls with the desktop's URL opener without waiting on each one,
+    falling back to webbrowser when $BROWSER is set or there's no desktop.
+    The opener gets its own session, so a Ctrl-C at our prompt doesn't reach
+    a browser it started.
+    '''
+    opener = None
+    if 'BROWSER' not in os.environ:
+        if sys.platform == 'darwin':
+            opener = shutil.which('open')
+        # Without a display xdg-open falls back to a text browser, which
+        # mustn't run detached from the terminal
+        elif 'DISPLAY' in os.environ or 'WAYLAND_DISPLAY' in os.environ:
+            opener = shutil.which('xdg-open')
+    for url in urls:
+        if opener is None:
+            import webbrowser
+
+            webbrowser.open(url)
+        else:
+            subprocess.Popen(
+                [opener, url],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
 
 
-def tasks_in_dir(path=''):
+@functools.lru_cache(maxsize=4096)
+def _cached_task(cwd, name, mtime_ns):
+    return Task(name)
+
+
+def tasks_in_dir(path='', tag=None):
+    '''
+    Yield the tasks in path. When a tag is given, files whose names don't
+    even contain it are skipped before any parsing; callers still need to
+    check the parsed tags.
+    '''
+    cwd = os.getcwd()
+    try:
+        entries = os.scandir(path or os.curdir)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    # Hand tasks out as the directory is read, rather than building a list
+    with entries:
+        for entry in entries:
+            if tag is not None and tag not in entry.name:
+                continue
+            # ignore hidden files and vim swap files
+            ext = os.path.splitext(entry.name)[1]
+            if (
+                entry.name in HIDDEN_FILES
+                or ext.startswith('.sw')
+                and len(ext) == 4
+                or not entry.is_file()
+            ):
+                continue
+            task = _cached_task(cwd, entry.name, entry.stat().st_mtime_ns)
+            if task.path.name != entry.name:
+                # The cached task has been renamed since, so start fresh
+                task = Task(entry.name)
+            yield task
+
+
+def complete_path(text):
+    '''
+    Find the paths that start with text, like glob.glob(text + '*') but
+    without treating the brackets in task names as a pattern.
+    '''
+    dirname, prefix = os.path.split(text)
     try:
-        files = [file for file in Path(path).iterdir() if file.is_file()]
-    except FileNotFoundError:
-        files = []
-    for file in files:
-        # ignore hidden files and vim swap files
-        if (
-            file.name in HIDDEN_FILES
-            or file.suffix.startswith('.sw')
-            and len(file.suffix) == 4
-        ):
-            continue
-        task = Task(file.name)
-        yield task
+        with os.scandir(dirname or os.curdir) as it:
+            return sorted(
+                os.path.join(dirname, entry.name)
+                for entry in it
+                if entry.name.startswith(prefix)
+                # like glob, only show hidden files when asked for them
+                and (prefix.startswith('.') or not entry.name.startswith('.'))
+            )
+    except OSError:
+        return []
 
 
 def is_git_tracked():
@@ -119,13 +253,10 @@ def is_git_tracked():
     Determine if the current directory is tracked via git.
     '''
     logger.debug('>>is_git_tracked')
-    DEVNULL = subprocess.DEVNULL
-    retcode = subprocess.call(
-        ['git', 'rev-parse'],
-        stdout=DEVNULL,
-        stderr=DEVNULL,
-    )
-    return retcode == 0
+    cwd = Path.cwd()
+    # .git is a directory in a normal checkout, and a file in worktrees
+    # and submodules
+    return any((path / '.git').exists() for path in (cwd, *cwd.parents))
 
 
 def git_postcmd(comment='shibboleth++'):
@@ -187,18 +318,33 @@ class Tags(list):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.listeners = []
+        self._set = set(self)
+        self._suspend = 0
+
+    def __contains__(self, item):
+        return item in self._set
 
     def _broadcast(self):
+        if self._suspend:
+            return
         for listener in self.listeners:
             listener()
 
     def append(self, item):
-        if item not in self:
-            super().append(item)
+        if item in self._set:
+            return
+        super().append(item)
+        self._set.add(item)
         self._broadcast()
 
     def extend(self, items):
-        super().extend(i for i in items if i not in self)
+        # Only tell the listeners once, no matter how many tags were added
+        self._suspend += 1
+        try:
+            for item in items:
+                self.append(item)
+        finally:
+            self._suspend -= 1
         self._broadcast()
 
     def sort(self):
@@ -207,48 +353,106 @@ class Tags(list):
 
     def remove(self, value):
         super().remove(value)
+        if not self.count(value):
+            self._set.discard(value)
+        self._broadcast()
+
+    def _resync(self):
+        # For the less common edits it's simpler to rebuild the set outright
+        self._set = set(self)
+        self._broadcast()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._resync()
+        return self
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._resync()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._resync()
+
+    def insert(self, index, item):
+        if item in self._set:
+            return
+        super().insert(index, item)
+        self._set.add(item)
+        self._broadcast()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._resync()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._resync()
+
+    def reverse(self):
+        super().reverse()
         self._broadcast()
 
 
 class Task:
     def __init__(self, filename):
-        m = re.search(TAG_PATTERN, filename)
-        if m is None:
-            self._missing_tags = True
+        m = FILENAME_PATTERN.match(filename)
+        tags = m.group('tags')
+        self._missing_tags = tags is None
+        if self._missing_tags:
             self.tags = Tags()
-            m = re.search(NO_TAG_PATTERN, filename)
+            self._title, self.ext = m.group('untagged_title', 'untagged_ext')
         else:
-            self._missing_tags = False
-            self.tags = Tags(m.group('tags').split())
-        self._title = m.group('title')
-        self.ext = m.group('ext')
+            self.tags = Tags(map(sys.intern, tags.split()))
+            self._title, self.ext = m.group('title', 'ext')
 
         self.tags.listeners.append(self._on_tag_update)
+        self._rename_depth = 0
+        self._rename_pending = False
+        self._filename = self._colorized_filename = None
         self._old_fname = Path(self.filename).expanduser().resolve()
 
-        if 'inbox' in self.tags:
-            self._priority = 'inbox'
-        elif '1-now' in self.tags:
-            self._priority = '1-now'
-        elif '2-next' in self.tags:
-            self._priority = '2-next'
-        elif '3-soon' in self.tags:
-            self._priority = '3-soon'
-        elif '4-later' in self.tags:
-            self._priority = '4-later'
-        elif '5-someday' in self.tags:
-            self._priority = '5-someday'
-        elif '6-waiting' in self.tags:
-            self._priority = '6-waiting'
-        else:
-            self._priority = None
+        self._priority = self._find_priority()
+
+    def _find_priority(self):
+        return next((p for p in PRIORITY_TAGS if p in self.tags), None)
 
     def _rename(self):
-        self._old_fname.rename(self.filename)
-        self._old_fname = Path(self.filename).expanduser().resolve()
+        # Tag edits only change the last path component, so there's no need
+        # to resolve the whole path again
+        new_fname = self._old_fname.with_name(os.path.basename(self.filename))
+        self._old_fname.rename(new_fname)
+        self._old_fname = new_fname
 
     def _on_tag_update(self):
-        self._rename()
+        self._filename = self._colorized_filename = None
+        # Tags can be edited directly (e.g. untag), so don't trust the old value
+        self._priority = self._find_priority()
+        if self._rename_depth:
+            self._rename_pending = True
+        else:
+            self._rename()
+
+    @contextmanager
+    def batch_updates(self):
+        '''
+        Hold off renaming the file until the outermost block exits, so several
+        tag changes only cost one rename.
+        '''
+        self._rename_depth += 1
+        try:
+            yield self
+        finally:
+            self._rename_depth -= 1
+            if not self._rename_depth and self._rename_pending:
+                self._rename_pending = False
+                self._rename()
 
     @property
     def title(self):
@@ -257,7 +461,10 @@ class Task:
     @title.setter
     def title(self, new_title):
         self._title = new_title
-        self._rename()
+        self._filename = self._colorized_filename = None
+        # The new title may point somewhere else entirely
+        self._old_fname.rename(self.filename)
+        self._old_fname = Path(self.filename).expanduser().resolve()
 
     @property
     def priority(self):
@@ -265,13 +472,14 @@ class Task:
 
     @priority.setter
     def priority(self, value):
-        if self._priority is not None:
-            self.tags.remove(self._priority)
-
-        if value is not None:
-            self.tags.append(value)
+        if value == self._priority:
+            return
+        with self.batch_updates():
+            if self._priority is not None:
+                self.tags.remove(self._priority)
 
-        self._priority = value
+            if value is not None:
+                self.tags.append(value)
 
     @property
     def path(self):
@@ -279,27 +487,32 @@ class Task:
 
     @property
     def filename(self):
-        if self._missing_tags and not self.tags:
-            tags = ''
-        else:
-            tags = f"[{' '.join(self.tags)}]"
-        ext = '.' + self.ext if self.ext else ''
-        return f'{self._title}{tags}{ext}'
+        if self._filename is None:
+            if self._missing_tags and not self.tags:
+                tags = ''
+            else:
+                tags = f"[{' '.join(self.tags)}]"
+            ext = '.' + self.ext if self.ext else ''
+            self._filename = f'{self._title}{tags}{ext}'
+        return self._filename
 
     @property
     def colorized_filename(self):
-        filename = self.filename
-        for tag in self.tags or []:
-            color = DEFAULT_COLORS.get(tag, '32')
-            colorized = f'\x1b[{color}m{tag}\x1b[0m'
-            filename = filename.replace(tag, colorized)
-        return filename
+        if self._colorized_filename is None:
+            if self._missing_tags and not self.tags:
+                tags = ''
+            else:
+                tags = f"[{' '.join(map(colorize, self.tags))}]"
+            ext = '.' + self.ext if self.ext else ''
+            self._colorized_filename = f'{self._title}{tags}{ext}'
+        return self._colorized_filename
 
     def complete(self):
         #completed_dir = Path('completed').absolute()
         #completed_dir.mkdir(parents=True, exist_ok=True)
-        self.priority = None
-        self.tags.append('done')
+        with self.batch_updates():
+            self.priority = None
+            self.tags.append('done')
         #new_path = completed_dir / Path(self.filename).name
         #Path(self.filename).rename(new_path)
         # TODO: Could we do a better job at renaming here? -W. Werner, 2019-10-15
@@ -313,18 +526,8 @@ class Task:
 
 
 def tasks_by_priority():
-    priorities = tuple(PRIORITIES.values()) + ('done', None)
-    by_priority = {
-        None: [],
-        'inbox': [],
-        'done': [],
-        '1-now': [],
-        '2-next': [],
-        '3-soon': [],
-        '4-later': [],
-        '5-someday': [],
-        '6-waiting': [],
-    }
+    priorities = PRIORITY_TAGS + ('done', None)
+    by_priority = {priority: [] for priority in priorities}
     for task in tasks_in_dir():
         if 'done' in task.tags:
             by_priority['done'].append(task)
@@ -338,10 +541,11 @@ class Reviewer(cmd.Cmd):
     def __init__(self, editor):
         super().__init__()
         self.editor = editor
-        self.tasks = tuple(tasks_by_priority())
-        self.priorities = reversed(list(t[0] for t in self.tasks if t[1]))
-        self.tasks = dict(self.tasks)
-        self._priority_iter = iter(self.priorities)
+        by_priority = list(tasks_by_priority())
+        self.tasks = dict(by_priority)
+        self._priority_iter = iter(
+            [priority for priority, tasks in reversed(by_priority) if tasks]
+        )
         self._cur_priority = next(self._priority_iter)
         self._index = 0
 
@@ -361,8 +565,7 @@ class Reviewer(cmd.Cmd):
 
     @property
     def prompt(self):
-        color = DEFAULT_COLORS.get(self._cur_priority, '32')
-        colorized = f'\x1b[{color}m{self._cur_priority}\x1b[0m'
+        colorized = colorize(self._cur_priority)
         return f'''\
 {self._cur.colorized_filename}
 Review ({self._index+1}/{len(self.tasks[self._cur_priority])}) {colorized} [?/1-6/d/e/v/l/s/n/q]> '''
@@ -401,29 +604,12 @@ q   quit review
     def do_l(self, line):
         launch(self._cur.path)
 
-    def do_1(self, line):
-        self._cur.priority = PRIORITIES['1']
-        return self.next()
-
-    def do_2(self, line):
-        self._cur.priority = PRIORITIES['2']
-        return self.next()
-
-    def do_3(self, line):
-        self._cur.priority = PRIORITIES['3']
-        return self.next()
-
-    def do_4(self, line):
-        self._cur.priority = PRIORITIES['4']
-        return self.next()
-
-    def do_5(self, line):
-        self._cur.priority = PRIORITIES['5']
-        return self.next()
-
-    def do_6(self, line):
-        self._cur.priority = PRIORITIES['6']
-        return self.next()
+    def default(self, line):
+        key = line.partition(' ')[0]
+        if key.isdigit() and key in PRIORITIES:
+            self._cur.priority = PRIORITIES[key]
+            return self.next()
+        return super().default(line)
 
     def do_s(self, line):
         '''
@@ -454,19 +640,23 @@ q   quit review
 
 
 class Shibboleth(cmd.Cmd):
-    plugins = load_plugins()
+    plugins = None
 
     def __init__(self, check_for_last_task=True):
-        # Register plugins before calling super's init
-        for plugin in self.plugins:
-            setattr(
-                Shibboleth,
-                'do_' + plugin,
-                types.MethodType(self.plugins[plugin].handle, self),
-            )
+        # Plugins are loaded by the first shell rather than at import time, so
+        # importing shibboleth doesn't have to compile and run all of them
+        if Shibboleth.plugins is None:
+            Shibboleth.plugins = load_plugins()
+            # Register plugins before calling super's init. They're plain
+            # functions on the class, so every shell (e.g. each Worker) gets
+            # its own bound method without registering them again.
+            for plugin in Shibboleth.plugins:
+                setattr(Shibboleth, 'do_' + plugin, Shibboleth.plugins[plugin].handle)
         super().__init__()
         self.is_git_tracked = is_git_tracked()
+        self.cwd = os.getcwd()
         self.selected = None
+        self._tag_names = None
         if check_for_last_task:
             try:
                 with open('.last.shib') as f:
@@ -478,8 +668,6 @@ class Shibboleth(cmd.Cmd):
                         self.do_select(line=last)
             except FileNotFoundError:
                 pass
-        readline.set_completion_display_matches_hook(self.display_completion)
-        readline.set_completer_delims(readline.get_completer_delims().replace('-', ''))
         self.editor = os.environ.get('EDITOR', 'vim')
         self.intro = dedent(
             f'''
@@ -495,9 +683,19 @@ class Shibboleth(cmd.Cmd):
     def prompt(self):
         if self.selected:
             return f'\N{RIGHTWARDS HARPOON WITH BARB UPWARDS}\x1b[34mshibboleth\x1b[0m:{self.selected.colorized_filename}\n>'
-        return f'\N{RIGHTWARDS HARPOON WITH BARB UPWARDS}\x1b[34mshibboleth\x1b[0m:{os.getcwd()}\n>'
+        return f'\N{RIGHTWARDS HARPOON WITH BARB UPWARDS}\x1b[34mshibboleth\x1b[0m:{self.cwd}\n>'
+
+    def preloop(self):
+        # readline is only needed interactively, so commands given on the
+        # command line don't pay for importing it
+        import readline
+
+        readline.set_completion_display_matches_hook(self.display_completion)
+        readline.set_completer_delims(readline.get_completer_delims().replace('-', ''))
 
     def display_completion(self, substitution, matches, longest_match_length):
+        import readline
+
         logger.debug('>>display_completion')
         print()
         print('  '.join(matches))
@@ -506,6 +704,8 @@ class Shibboleth(cmd.Cmd):
         sys.stdout.flush()
 
     def complete(self, *args, **kwargs):
+        import readline
+
         logger.debug('>>complete')
         logger.debug('%r %r', args, kwargs)
         cmd = readline.get_line_buffer().split(None, maxsplit=1)[0]
@@ -528,8 +728,10 @@ class Shibboleth(cmd.Cmd):
 
     def postcmd(self, stop, line):
         logger.debug('>>postcmd')
-        if self.is_git_tracked:
-            git_postcmd('shibboleth ' + line.partition(' ')[0])
+        self._tag_names = None
+        command = line.partition(' ')[0]
+        if self.is_git_tracked and command not in READ_ONLY_COMMANDS:
+            git_postcmd('shibboleth ' + command)
         return stop
 
     def postloop(self):
@@ -554,14 +756,15 @@ class Shibboleth(cmd.Cmd):
         logger.debug('>>do_cd')
         try:
             os.chdir(line)
+            self.cwd = os.getcwd()
             self.is_git_tracked = is_git_tracked()
+            self._tag_names = None
         except Exception as e:
             print(e)
 
     def complete_cd(self, text, line, begidx, endidx):
         logger.debug('>>complete_cd')
-        paths = glob.glob(text + '*')
-        return paths
+        return complete_path(text)
 
     def do_pls(self, line):
         '''
@@ -575,10 +778,17 @@ class Shibboleth(cmd.Cmd):
         except KeyError:
             print(f'Unknown priority {line!r}')
             target = PRIORITIES['1']
+        self.list_priority(target)
 
-        for task in tasks_in_dir():
-            if target in task.tags:
-                print(task.colorized_filename)
+    def list_priority(self, priority):
+        '''
+        Show the tasks tagged with priority.
+        '''
+        print_lines(
+            task.colorized_filename
+            for task in tasks_in_dir(tag=priority)
+            if priority in task.tags
+        )
 
     def do_work(self, line):
         '''
@@ -587,9 +797,11 @@ class Shibboleth(cmd.Cmd):
         present. For instance, 'work 6-waiting email security' would work all
         the tasks that have 6-waiting, email, and security.
         '''
-        tags = set(PRIORITIES.get(tag or '1', tag) for tag in line.split()) or {'1-now'}
+        tags = {
+            sys.intern(PRIORITIES.get(tag or '1', tag)) for tag in line.split()
+        } or {'1-now'}
         tasks_to_work = [
-            task for task in tasks_in_dir() if tags.issubset(set(task.tags))
+            task for task in tasks_in_dir() if all(tag in task.tags for tag in tags)
         ]
         if not tasks_to_work:
             print(f"No tasks for tag set {', '.join(sorted(tags))!r}")
@@ -602,50 +814,38 @@ class Shibboleth(cmd.Cmd):
         tag = text.lstrip(
             '-'
         )  # Not quite relevant yet, but soon - for better tag operations
-        tag_names = set(itertools.chain(*[task.tags for task in tasks_in_dir()]))
-        return sorted(name for name in tag_names if name.startswith(text))
-
-    def do_now(self, line):
-        '''
-        Show tasks with a priority of 1-now
-        '''
-        logger.debug('>>do_now')
-        self.do_pls(line='1')
-
-    def do_next(self, line):
-        '''
-        Show tasks with a priority of 2-next
-        '''
-        logger.debug('>>do_next')
-        self.do_pls(line='2')
+        # Tab is hit over and over while typing, so only scan the directory
+        # once per command
+        if self._tag_names is None:
+            self._tag_names = sorted(
+                set(itertools.chain.from_iterable(task.tags for task in tasks_in_dir()))
+            )
+        start = bisect.bisect_left(self._tag_names, text)
+        return list(
+            itertools.takewhile(
+                lambda name: name.startswith(text), self._tag_names[start:]
+            )
+        )
 
-    def do_soon(self, line):
-        '''
-        Show tasks with a priority of 3-soon
-        '''
-        logger.debug('>>do_soon')
-        self.do_pls(line='3')
+    def _priority_lister(key):
+        priority = PRIORITIES[key]
 
-    def do_later(self, line):
-        '''
-        Show tasks with a priority of 4-later
-        '''
-        logger.debug('>>do_later')
-        self.do_pls(line='4')
+        def do_list(self, line):
+            logger.debug('>>do_%s', priority.partition('-')[2])
+            self.list_priority(priority)
 
-    def do_someday(self, line):
+        do_list.__doc__ = f'''
+        Show tasks with a priority of {priority}
         '''
-        Show tasks with a priority of 5-someday
-        '''
-        logger.debug('>>do_someday')
-        self.do_pls(line='5')
+        return do_list
 
-    def do_waiting(self, line):
-        '''
-        Show tasks with a priority of 6-waiting
-        '''
-        logger.debug('>>do_waiting')
-        self.do_pls(line='6')
+    do_now = _priority_lister('1')
+    do_next = _priority_lister('2')
+    do_soon = _priority_lister('3')
+    do_later = _priority_lister('4')
+    do_someday = _priority_lister('5')
+    do_waiting = _priority_lister('6')
+    del _priority_lister
 
     def do_deselect(self, line):
         '''
@@ -669,7 +869,7 @@ class Shibboleth(cmd.Cmd):
 
     def complete_select(self, text, line, begidx, endidx):
         logger.debug('>>complete_select')
-        paths = glob.glob(text + '*')
+        paths = complete_path(text)
         logger.debug('Possible paths: %r', paths)
         return paths
 
@@ -703,48 +903,32 @@ class Shibboleth(cmd.Cmd):
         '''
         Show a breakdown of tasks by priority.
         '''
-        by_priority = {
-            None: [],
-            'inbox': [],
-            'done': [],
-            '1-now': [],
-            '2-next': [],
-            '3-soon': [],
-            '4-later': [],
-            '5-someday': [],
-            '6-waiting': [],
-        }
-        total_task_count = 0
-        for task in tasks_in_dir():
-            total_task_count += 1
-            if 'done' in task.tags:
-                by_priority['done'].append(task)
-            else:
-                by_priority[task.priority].append(task)
+        by_priority = list(tasks_by_priority())
+        total_task_count = sum(len(tasks) for _, tasks in by_priority)
 
-        priorities = {'done': 'done'}
-        priorities.update(PRIORITIES)
         target = None
         if line:
             try:
-                target = priorities[line]
+                target = REPORT_PRIORITIES[line]
             except KeyError:
                 print(f'Unknown priority {line!r}')
 
-        for priority in list(PRIORITIES.values()) + ['done', None]:
-            these_ones = by_priority[priority]
+        lines = []
+        for priority, these_ones in by_priority:
             if not target or target == priority:
-                print(priority, f'({len(these_ones)}/{total_task_count})')
-                for task in these_ones:
-                    print(f'\t{task.colorized_filename}')
+                lines.append(f'{priority} ({len(these_ones)}/{total_task_count})')
+                lines.extend(f'\t{task.colorized_filename}' for task in these_ones)
+        print_lines(lines)
 
     def do_ls(self, line):
         '''
         Show tasks/files in the current (or provided) directory.
         '''
         logger.debug('>>do_ls')
-        for task in tasks_in_dir(line.strip()):
-            print(task.colorized_filename)
+        path = line.strip()
+        if path.startswith('~'):
+            path = os.path.expanduser(path)
+        print_lines(task.colorized_filename for task in tasks_in_dir(path))
 
     def do_show(self, line):
         '''
@@ -754,10 +938,8 @@ class Shibboleth(cmd.Cmd):
         if not self.selected or line:
             print('Select a file and try again')
         else:
-            filename = self.selected.filename if self.selected else line
             print('*' * 80)
-            with open(filename) as f:
-                print(self.selected.read())
+            print(self.selected.read())
             print('*' * 80)
 
     def do_edit(self, line, flags=''):
@@ -833,7 +1015,8 @@ class Shibboleth(cmd.Cmd):
             return
         else:
             tags = line.split()
-        self.selected.tags.extend(tags)
+        with self.selected.batch_updates():
+            self.selected.tags.extend(tags)
 
     def complete_tag(self, text, line, begidx, endidx):
         return self.complete_work(text, line, begidx, endidx)
@@ -847,11 +1030,12 @@ class Shibboleth(cmd.Cmd):
             return
         else:
             tags = line.split()
-        for tag in tags:
-            try:
-                self.selected.tags.remove(tag)
-            except ValueError:
-                logger.debug(f'Tag {tag} not in {self.selected.tags}')
+        with self.selected.batch_updates():
+            for tag in tags:
+                try:
+                    self.selected.tags.remove(tag)
+                except ValueError:
+                    logger.debug(f'Tag {tag} not in {self.selected.tags}')
 
     def complete_untag(self, text, line, begidx, endidx):
         return self.complete_work(text, line, begidx, endidx)
@@ -1,7 +1,12 @@
 import os
 import io
 import shibboleth
+import shlex
+import signal
+import subprocess
+import sys
 import tempfile
+import threading
 import unittest
 import unittest.mock as mock
 
@@ -126,6 +131,54 @@ class TestShibbolethTask(unittest.TestCase):
 
         self.assertTrue(expected_filename.exists(), str(os.listdir()))
 
+    def test_is_git_tracked_should_look_for_git_in_parent_directories(self):
+        # The temp dir may itself live inside a checkout, so ignore any .git
+        # above it
+        root = Path(self.tempdir.name).resolve()
+        real_exists = Path.exists
+
+        def exists(path):
+            return (path == root or root in path.parents) and real_exists(path)
+
+        Path('nested').mkdir()
+        os.chdir('nested')
+        with mock.patch.object(Path, 'exists', exists):
+            untracked = shibboleth.is_git_tracked()
+            Path(self.tempdir.name, '.git').mkdir()
+            tracked = shibboleth.is_git_tracked()
+
+        self.assertFalse(untracked)
+        self.assertTrue(tracked)
+
+    def test_extending_tags_should_notify_listeners_once(self):
+        tags = shibboleth.Tags(['boring'])
+        listener = mock.Mock()
+        tags.listeners.append(listener)
+
+        tags.extend(['and', 'new', 'and', 'boring'])
+
+        self.assertEqual(tags, ['boring', 'and', 'new'])
+        listener.assert_called_once_with()
+
+    def test_every_tags_edit_should_keep_membership_in_sync(self):
+        tags = shibboleth.Tags(['a'])
+        listener = mock.Mock()
+        tags.listeners.append(listener)
+
+        tags += ['b']
+        tags.insert(0, 'c')
+        tags[1] = 'd'
+        del tags[2]
+        tags.pop()
+
+        self.assertEqual(tags, ['c'])
+        self.assertIn('c', tags)
+        for gone in 'abd':
+            self.assertNotIn(gone, tags)
+        tags.clear()
+        self.assertNotIn('c', tags)
+        self.assertEqual(listener.call_count, 6)
+
     def test_when_tags_are_sorted_it_should_rename_the_file(self):
         old_filename = Path('foo bar [zoo bar apple].quux')
         old_filename.touch()
@@ -187,20 +240,65 @@ class TestShibbolethTask(unittest.TestCase):
 
         self.assertTrue(expected_filename.exists(), str(os.listdir()))
 
+    def test_setting_the_same_priority_should_leave_the_file_alone(self):
+        old_filename = Path('foo bar [1-now here].quux')
+        old_filename.touch()
+        task = shibboleth.Task(old_filename.name)
+
+        task.priority = '1-now'
+
+        self.assertEqual(task.filename, old_filename.name)
+        self.assertTrue(old_filename.exists(), str(os.listdir()))
+
+    def test_priority_should_follow_tags_edited_directly(self):
+        old_filename = Path('x [1-now].md')
+        old_filename.touch()
+        expected_filename = Path('x [1-now].md')
+        task = shibboleth.Task(old_filename.name)
+
+        task.tags.remove('1-now')
+        self.assertIsNone(task.priority)
+        task.priority = '1-now'
+
+        self.assertTrue(expected_filename.exists(), str(os.listdir()))
+
+    def test_batched_tag_updates_should_rename_the_file_once(self):
+        old_filename = Path('foo bar [here gone 1-now].quux')
+        old_filename.touch()
+        expected_filename = Path('foo bar [gone 2-next new].quux')
+        task = shibboleth.Task(old_filename.name)
+
+        with mock.patch.object(task, '_rename', wraps=task._rename) as rename:
+            with task.batch_updates():
+                task.tags.remove('here')
+                task.priority = '2-next'
+                task.tags.append('new')
+
+        rename.assert_called_once_with()
+        self.assertTrue(expected_filename.exists(), str(os.listdir()))
+
     def test_colorized_should_set_expected_colors_on_filename(self):
         filename_template = 'this is [some {}]'
         for priority in shibboleth.PRIORITIES.values():
             filename = filename_template.format(priority)
-            expected_filename = filename
-            for tag in ['some', priority]:
-                color = shibboleth.DEFAULT_COLORS.get(tag, '32')
-                colorized = f'\x1b[{color}m{tag}\x1b[0m'
-                expected_filename = expected_filename.replace(tag, colorized)
+            colorized = [
+                f'\x1b[{shibboleth.DEFAULT_COLORS.get(tag, 32)}m{tag}\x1b[0m'
+                for tag in ['some', priority]
+            ]
+            expected_filename = f"this is [{' '.join(colorized)}]"
             task = shibboleth.Task(filename)
 
             with self.subTest():
                 self.assertEqual(task.colorized_filename, expected_filename)
 
+    def test_colorized_should_only_color_whole_tags(self):
+        task = shibboleth.Task('done some [some 5-someday].md')
+
+        self.assertEqual(
+            task.colorized_filename,
+            'done some [\x1b[32msome\x1b[0m \x1b[90m5-someday\x1b[0m].md',
+        )
+
     def test_complete_should_remove_priority_and_tag_and_set_done_tag(self):
         old_filename = Path('foo bar [here gone 1-now].quux')
         old_filename.touch()
@@ -221,6 +319,108 @@ class TestShibbolethTask(unittest.TestCase):
 
         self.assertEqual(task.read(), expected_text)
 
+    def test_edit_should_run_the_editor_without_a_shell(self):
+        with mock.patch('subprocess.Popen') as fake_popen:
+            shibboleth.edit('vim', "+'normal Go' -c 'startinsert'", 'foo "bar" [1-now].md')
+            shibboleth.edit('code -w', "+'normal Go'", 'foo.md')
+
+        self.assertEqual(
+            fake_popen.call_args_list,
+            [
+                mock.call(
+                    ['vim', '-n', '+normal Go', '-c', 'startinsert', 'foo "bar" [1-now].md']
+                ),
+                mock.call(['code', '-w', 'foo.md']),
+            ],
+        )
+
+    def test_ctrl_c_while_editing_should_be_left_to_the_editor(self):
+        # Stands in for e.g. emacs -nw, where C-g sends SIGINT
+        Path('editor.py').write_text(
+            'import signal, sys, time\n'
+            'signal.signal(signal.SIGINT, signal.SIG_IGN)\n'
+            'time.sleep(0.5)\n'
+            'open(sys.argv[1], "w").write("saved")\n'
+        )
+        editor = shlex.join([sys.executable, 'editor.py'])
+        interrupt = threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT))
+
+        interrupt.start()
+        try:
+            shibboleth.edit(editor, '', 'foo.md')
+        finally:
+            interrupt.cancel()
+
+        self.assertEqual(Path('foo.md').read_text(), 'saved')
+        self.assertIs(signal.getsignal(signal.SIGINT), signal.default_int_handler)
+
+    def test_edit_with_a_missing_editor_should_print_an_error(self):
+        with mock.patch('sys.stdout', io.StringIO()) as fake_out:
+            shibboleth.edit('no-such-editor-anywhere', '', 'foo.md')
+            shibboleth.edit("vim 'unbalanced", '', 'foo.md')
+
+        lines = fake_out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2, lines)
+        self.assertTrue(lines[0].startswith("Unable to run editor 'no-such-editor-anywhere'"))
+        self.assertTrue(lines[1].startswith('Unable to run editor "vim \'unbalanced"'))
+
+    def test_launch_should_open_the_url_header(self):
+        task_file = Path('foo bar [1-now].md')
+        task_file.write_text(
+            'Title: foo bar\nURL: https://example.com\n\n\nURL: https://body.example.com\n'
+        )
+
+        with mock.patch('shibboleth.open_in_browser') as fake_open:
+            shibboleth.launch(task_file)
+
+        fake_open.assert_called_once_with(['https://example.com'])
+
+    def test_open_in_browser_should_only_detach_with_a_display(self):
+        urls = ['https://example.com']
+        with mock.patch('sys.platform', 'linux'), mock.patch(
+            'shutil.which', return_value='/usr/bin/xdg-open'
+        ), mock.patch('subprocess.Popen') as fake_popen, mock.patch(
+            'webbrowser.open'
+        ) as fake_open:
+            with mock.patch.dict('os.environ', {'DISPLAY': ':0'}, clear=True):
+                shibboleth.open_in_browser(urls)
+            with mock.patch.dict('os.environ', {}, clear=True):
+                shibboleth.open_in_browser(urls)
+
+        fake_popen.assert_called_once_with(
+            ['/usr/bin/xdg-open', 'https://example.com'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        fake_open.assert_called_once_with('https://example.com')
+
+    def test_complete_path_should_match_names_with_brackets(self):
+        Path('sub').mkdir()
+        Path('sub', 'foo [1-now].md').touch()
+        Path('sub', 'foo [2-next].md').touch()
+        Path('sub', '.foo.swp').touch()
+
+        self.assertEqual(
+            shibboleth.complete_path(os.path.join('sub', 'foo [1')),
+            [os.path.join('sub', 'foo [1-now].md')],
+        )
+        self.assertEqual(
+            shibboleth.complete_path(os.path.join('sub', 'f')),
+            [os.path.join('sub', 'foo [1-now].md'), os.path.join('sub', 'foo [2-next].md')],
+        )
+
+    def test_tasks_in_dir_should_reuse_tasks_until_they_are_renamed(self):
+        Path('foo bar [here].quux').touch()
+
+        first, = shibboleth.tasks_in_dir()
+        again, = shibboleth.tasks_in_dir()
+        first.tags.append('there')
+        renamed, = shibboleth.tasks_in_dir()
+
+        self.assertIs(first, again)
+        self.assertEqual(renamed.filename, 'foo bar [here there].quux')
+
 
     ###############################################################
     ###############################################################
@@ -237,11 +437,38 @@ class TestShibbolethTask(unittest.TestCase):
             shib.onecmd('log off')
             fake_out.seek(0)
             self.assertEqual(fake_out.read(), expected_stdout)
-        os.system('cp shibboleth.log /tmp/shib.log')
         with open('shibboleth.log') as f:
             log = f.read()
             self.assertEqual(log, expected_log)
 
+    def test_postcmd_should_only_commit_after_commands_that_change_tasks(self):
+        shib = shibboleth.Shibboleth(check_for_last_task=False)
+        shib.is_git_tracked = True
+
+        with mock.patch('shibboleth.git_postcmd') as fake_git_postcmd:
+            for line in ('ls', 'help tag', '?', 'pls 1'):
+                shib.postcmd(False, line)
+            fake_git_postcmd.assert_not_called()
+            shib.postcmd(False, 'tag 1-now')
+            shib.postcmd(False, 'new some task')
+
+        self.assertEqual(
+            fake_git_postcmd.call_args_list,
+            [mock.call('shibboleth tag'), mock.call('shibboleth new')],
+        )
+
+    def test_review_digit_should_set_the_priority(self):
+        Path('foo bar [1-now].md').touch()
+        reviewer = shibboleth.Reviewer('vim')
+
+        with mock.patch('cmd.Cmd.default') as fake_default:
+            reviewer.onecmd('x')
+            done = reviewer.onecmd('3')
+
+        fake_default.assert_called_once_with('x')
+        self.assertTrue(done)
+        self.assertTrue(Path('foo bar [3-soon].md').exists(), str(os.listdir()))
+
 
 if __name__ == '__main__':
     unittest.main(TestShibbolethTask())